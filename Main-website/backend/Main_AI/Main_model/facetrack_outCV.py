@@ -5,6 +5,7 @@ from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 from dataclasses import dataclass
 from typing import Tuple, List, Dict, Optional
+from .landmarker import create_face_landmarker
 
 
 @dataclass
@@ -55,7 +56,7 @@ class FaceTracker01:
     LEFT_Black_eye = 473
     RIGHT_Black_eye = 468
 
-    def __init__(self, model_path: str = 'face_landmarker.task', isVideo:bool = True, show_visualization: bool = False, Label_display: bool = False, last_y_value: int = 0):
+    def __init__(self, model_path: str = 'face_landmarker.task', isVideo:bool = True, show_visualization: bool = False, Label_display: bool = False, last_y_value: int = 0, use_gpu: bool = False):
         """Initialize FaceTracker with model path and visualization flag"""
         self.show_visualization = show_visualization
         self.Label_display = Label_display
@@ -63,21 +64,7 @@ class FaceTracker01:
         
         self.isVideo = isVideo
         # Initialize MediaPipe Face Landmarker
-        base_options = mp.tasks.BaseOptions(
-            model_asset_path=model_path,
-            # delegate=python.BaseOptions.Delegate.GPU
-        )
-        options = mp.tasks.vision.FaceLandmarkerOptions(
-            base_options=base_options,
-            running_mode= mp.tasks.vision.RunningMode.VIDEO if self.isVideo else mp.tasks.vision.RunningMode.IMAGE,
-            output_face_blendshapes=True,
-            output_facial_transformation_matrixes=True,
-            num_faces=1,
-            min_face_detection_confidence=0.6, 
-            min_face_presence_confidence=0.6,  
-            min_tracking_confidence=0.6  
-        )
-        self.detector = mp.tasks.vision.FaceLandmarker.create_from_options(options)
+        self.detector = create_face_landmarker(model_path, isVideo=self.isVideo, use_gpu=use_gpu)
         self.last_metrics = None
 
     def _calculate_eye_aspect_ratio(self, eye_points: List[Tuple[int, int]]) -> float:
@@ -1,37 +1,21 @@
 
 import numpy as np
-import mediapipe as mp
-from mediapipe.tasks import python
-from mediapipe.tasks.python import vision
 import math
 from dataclasses import dataclass
 from typing import Tuple, List, Dict, Optional
+from .landmarker import create_face_landmarker
 
 class HeadPoseTracker01:
     """Class for head pose estimation using MediaPipe"""
     
-    def __init__(self, model_path: str = 'face_landmarker.task', isVideo:bool = True, show_visualization: bool = False, isMaskOn: bool = False, numYaxis_labels: int = 30, position_base_3d: Tuple[int, int] = (960, 540)):
+    def __init__(self, model_path: str = 'face_landmarker.task', isVideo:bool = True, show_visualization: bool = False, isMaskOn: bool = False, numYaxis_labels: int = 30, position_base_3d: Tuple[int, int] = (960, 540), use_gpu: bool = False):
         """Initialize HeadPoseTracker with model path and visualization flag"""
         self.show_visualization = show_visualization
         self.isMaskOn = isMaskOn
         self.numYaxis_labels = numYaxis_labels
         self.position_base_3d = position_base_3d
         self.isVideo = isVideo
-        base_options = mp.tasks.BaseOptions(
-            model_asset_path=model_path,
-            # delegate=python.BaseOptions.Delegate.GPU
-        )
-        options = mp.tasks.vision.FaceLandmarkerOptions(
-            base_options=base_options,
-            running_mode= mp.tasks.vision.RunningMode.VIDEO if self.isVideo else mp.tasks.vision.RunningMode.IMAGE,
-            output_face_blendshapes=True,
-            output_facial_transformation_matrixes=True,
-            num_faces=1,
-            min_face_detection_confidence=0.6, 
-            min_face_presence_confidence=0.6,  
-            min_tracking_confidence=0.6  
-        )
-        self.detector = mp.tasks.vision.FaceLandmarker.create_from_options(options)
+        self.detector = create_face_landmarker(model_path, isVideo=self.isVideo, use_gpu=use_gpu)
         
         
     def calculate_angles(self, face_landmarks) -> Tuple[float, float, float]:
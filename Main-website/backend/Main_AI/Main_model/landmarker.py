@@ -0,0 +1,42 @@
+import os
+import mediapipe as mp
+
+
+def gpu_requested() -> bool:
+    """Whether the GPU delegate was asked for via the MEDIAPIPE_USE_GPU env var"""
+    return os.environ.get("MEDIAPIPE_USE_GPU", "0").lower() in ("1", "true", "yes")
+
+
+def create_face_landmarker(model_path: str, isVideo: bool = True, use_gpu: bool = False):
+    """
+    Build a FaceLandmarker, trying the GPU delegate first when use_gpu is set.
+
+    MediaPipe only reports a missing GPU/OpenGL context when the task is created,
+    so the GPU attempt doubles as the feature probe and we fall back to CPU on failure.
+    """
+    def build(delegate):
+        base_options = mp.tasks.BaseOptions(
+            model_asset_path=model_path,
+            delegate=delegate
+        )
+        options = mp.tasks.vision.FaceLandmarkerOptions(
+            base_options=base_options,
+            running_mode= mp.tasks.vision.RunningMode.VIDEO if isVideo else mp.tasks.vision.RunningMode.IMAGE,
+            output_face_blendshapes=True,
+            output_facial_transformation_matrixes=True,
+            num_faces=1,
+            min_face_detection_confidence=0.6,
+            min_face_presence_confidence=0.6,
+            min_tracking_confidence=0.6
+        )
+        return mp.tasks.vision.FaceLandmarker.create_from_options(options)
+
+    if use_gpu:
+        try:
+            detector = build(mp.tasks.BaseOptions.Delegate.GPU)
+            print("🚀 FaceLandmarker running on GPU delegate")
+            return detector
+        except Exception as e:
+            print(f"⚠️ GPU delegate unavailable, falling back to CPU: {e}")
+
+    return build(mp.tasks.BaseOptions.Delegate.CPU)
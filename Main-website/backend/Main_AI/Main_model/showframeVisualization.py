@@ -22,6 +22,124 @@ from mediapipe import Image
 import os
 import sys
 
+# Resolved once at import so trackers don't depend on the caller's cwd
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+FULL_MODEL_PATH = os.path.join(MODEL_DIR, "face_landmarker.task")
+LITE_MODEL_PATH = os.path.join(MODEL_DIR, "face_landmarker_lite.task")
+
+def select_model_path(quality: Optional[str] = None) -> str:
+    """
+    Pick the landmarker model from EYETRACKING_MODEL_QUALITY (full|lite).
+    The lite/quantized build runs noticeably faster on CPU-only hosts and uses
+    less memory, at the cost of slightly less stable landmarks on small faces.
+    Returns the bundled path for the chosen quality; it may not exist yet.
+    """
+    quality = (quality or os.environ.get("EYETRACKING_MODEL_QUALITY", "full")).lower()
+    return LITE_MODEL_PATH if quality == "lite" else FULL_MODEL_PATH
+
+MODEL_PATH = select_model_path()
+
+# Hugging Face repo used when the model isn't bundled next to this module
+MODEL_REPO_ID = os.environ.get("FACE_LANDMARKER_REPO", "porch/Detected_UpScaleImage")
+
+def _locate_model(model_path: str) -> str:
+    """
+    Return the bundled model file, else the copy in the local Hugging Face cache
+    (downloaded once, reused on later boots). Raises FileNotFoundError if neither has it.
+    """
+    if os.path.exists(model_path):
+        return model_path
+
+    from huggingface_hub import snapshot_download
+
+    filename = os.path.basename(model_path)
+    download_kwargs = dict(
+        repo_id=MODEL_REPO_ID,
+        repo_type="model",
+        allow_patterns=[f"Main_model/{filename}"],
+        token=os.environ.get("HF_TOKEN"),
+    )
+    try:
+        # Warm cache: resolve locally without the Hub etag round-trip
+        snapshot_dir = snapshot_download(local_files_only=True, **download_kwargs)
+    except Exception:
+        if os.environ.get("HF_HUB_OFFLINE", "0") not in ("0", "", "false", "False"):
+            raise FileNotFoundError(f"Face landmarker model not found at {model_path} and HF_HUB_OFFLINE is set")
+        print(f"🔽 Fetching {filename} from Hugging Face ({MODEL_REPO_ID})...")
+        snapshot_dir = snapshot_download(**download_kwargs)
+    path = os.path.join(snapshot_dir, "Main_model", filename)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Face landmarker model not found at {model_path} or in {MODEL_REPO_ID}")
+    return path
+
+def resolve_model_path() -> str:
+    """
+    Find the landmarker model: FACE_LANDMARKER_PATH override, then the model chosen by
+    EYETRACKING_MODEL_QUALITY (bundled or Hugging Face). A lite model that can't be
+    found falls back to the full model so the knob never breaks tracker startup.
+    """
+    local = os.environ.get("FACE_LANDMARKER_PATH")
+    if local and os.path.exists(local):
+        return local
+    if MODEL_PATH == LITE_MODEL_PATH:
+        try:
+            return _locate_model(LITE_MODEL_PATH)
+        except Exception as e:
+            print(f"⚠️ Lite face landmarker model unavailable ({e}), using full model")
+    return _locate_model(FULL_MODEL_PATH)
+
+# Head-pose labels indexed by classify_head_pose codes (0 = within threshold, 1 = positive, 2 = negative)
+POSTURE_LABELS = ("Looking Straight", "Looking Down", "Looking Up")
+GAZE_LABELS = ("Looking Straight", "Looking Right", "Looking Left")
+HEAD_POSE_THRESHOLD_DEG = 10
+
+def classify_head_pose(pitch: float, yaw: float) -> Tuple[str, str]:
+    """
+    Map pitch/yaw (degrees) to the posture and gaze-direction labels reported to clients
+    """
+    t = HEAD_POSE_THRESHOLD_DEG
+    posture = POSTURE_LABELS[1 if pitch > t else 2 if pitch < -t else 0]
+    gaze_direction = GAZE_LABELS[1 if yaw > t else 2 if yaw < -t else 0]
+    return posture, gaze_direction
+
+# Output field names shared by the single-image response and the batch parameter CSV,
+# so both endpoints report the same metrics under the same keys.
+# (attribute, nested response keys, flat x1/y1/x2/y2 keys) for the two-point metrics, in output order
+POINT_PAIR_FIELDS = (
+    ('face_box', ('min', 'max'),
+     ('face_min_position_x', 'face_min_position_y', 'face_max_position_x', 'face_max_position_y')),
+    ('left_eye_box', ('min', 'max'),
+     ('left_eye_box_min_x', 'left_eye_box_min_y', 'left_eye_box_max_x', 'left_eye_box_max_y')),
+    ('right_eye_box', ('min', 'max'),
+     ('right_eye_box_min_x', 'right_eye_box_min_y', 'right_eye_box_max_x', 'right_eye_box_max_y')),
+    ('eye_iris_center', ('left', 'right'),
+     ('left_iris_center_x', 'left_iris_center_y', 'right_iris_center_x', 'right_iris_center_y')),
+    ('eye_iris_left_box', ('min', 'max'),
+     ('left_iris_box_min_x', 'left_iris_box_min_y', 'left_iris_box_max_x', 'left_iris_box_max_y')),
+    ('eye_iris_right_box', ('min', 'max'),
+     ('right_iris_box_min_x', 'right_iris_box_min_y', 'right_iris_box_max_x', 'right_iris_box_max_y')),
+)
+
+# Flat keys for eye_centers entries: left eye, right eye, midpoint between the eyes
+EYE_CENTER_KEYS = (
+    ('left_eye_position_x', 'left_eye_position_y'),
+    ('right_eye_position_x', 'right_eye_position_y'),
+    ('center_between_eyes_x', 'center_between_eyes_y'),
+)
+
+# Map specific landmark positions to our named parameters
+LANDMARK_KEYS = {
+    'nose': ('nose_position_x', 'nose_position_y'),
+    'chin': ('chin_position_x', 'chin_position_y'),
+    'face_center': ('face_center_position_x', 'face_center_position_y'),
+    'left_cheek': ('cheek_left_position_x', 'cheek_left_position_y'),
+    'right_cheek': ('cheek_right_position_x', 'cheek_right_position_y'),
+    'left_mouth': ('mouth_left_position_x', 'mouth_left_position_y'),
+    'right_mouth': ('mouth_right_position_x', 'mouth_right_position_y'),
+    'left_eye_socket': ('eye_socket_left_center_x', 'eye_socket_left_center_y'),
+    'right_eye_socket': ('eye_socket_right_center_x', 'eye_socket_right_center_y')
+}
+
 @dataclass
 class all_data_output:
     head_pose_angles: Tuple[float, float, float]
@@ -46,7 +164,7 @@ class all_data_output:
     depths: Tuple[float, float, float, float]
 
 class FrameShow_head_face:
-    def __init__(self, model_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "face_landmarker.task"), isVideo =True, position_base_3d: Tuple[int, int] = (960, 540), isHeadposeOn: bool = False, isFaceOn: bool = False):
+    def __init__(self, model_path = MODEL_PATH, isVideo =True, position_base_3d: Tuple[int, int] = (960, 540), isHeadposeOn: bool = False, isFaceOn: bool = False):
 
         self.isVideo = isVideo
         base_options = mp.tasks.BaseOptions(
@@ -322,7 +440,8 @@ class FrameShow_head_face:
         # head
         pitch, yaw, roll  = self.tracker_headpose.get_calculate_angles(face_landmarks)
         # face
-        all_element = self.tracker_face.main_process(face_landmarks, frame.copy(), frame_height, frame_width)
+        # main_process only reads landmarks and the frame shape, so no copy is needed
+        all_element = self.tracker_face.main_process(face_landmarks, frame, frame_height, frame_width)
         
         return all_element, (pitch, yaw, roll), (frame_width, frame_height), face_landmarks, frame
     
@@ -404,7 +523,8 @@ class FrameShow_head_face:
             landmark_positions=getattr(all_element, "landmark_positions", None)
         )
         if self.isFaceOn:
-            frame = self._draw_visualization(face_landmarks, frame.copy(), metrics)
+            # Head pose and mask are already drawn in place on this buffer; keep drawing on it
+            frame = self._draw_visualization(face_landmarks, frame, metrics)
             
             # if self.isZoomFace:
             #     # frame = cv2.resize(enhanced_face, (frame_width, frame_height))
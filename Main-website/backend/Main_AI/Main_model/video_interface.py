@@ -12,6 +12,7 @@ from typing import Tuple, List, Dict, Optional
 
 from .headpose_outCV import HeadPoseTracker01
 from .facetrack_outCV import FaceTracker01
+from .landmarker import create_face_landmarker
 
 from PIL import Image
 # Suppress torchvision deprecation warnings
@@ -46,24 +47,10 @@ class all_data_output:
     depths: Tuple[float, float, float, float]
 
 class FrameShow_head_face:
-    def __init__(self, model_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "face_landmarker.task"), isVideo =True, position_base_3d: Tuple[int, int] = (960, 540), isHeadposeOn: bool = False, isFaceOn: bool = False):
+    def __init__(self, model_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "face_landmarker.task"), isVideo =True, position_base_3d: Tuple[int, int] = (960, 540), isHeadposeOn: bool = False, isFaceOn: bool = False, use_gpu: bool = False):
 
         self.isVideo = isVideo
-        base_options = mp.tasks.BaseOptions(
-            model_asset_path=model_path,
-            # delegate=python.BaseOptions.Delegate.GPU
-        )
-        options = mp.tasks.vision.FaceLandmarkerOptions(
-            base_options=base_options,
-            running_mode= mp.tasks.vision.RunningMode.VIDEO if self.isVideo else mp.tasks.vision.RunningMode.IMAGE,
-            output_face_blendshapes=True,
-            output_facial_transformation_matrixes=True,
-            num_faces=1,
-            min_face_detection_confidence=0.6, 
-            min_face_presence_confidence=0.6,  
-            min_tracking_confidence=0.6  
-        )
-        self.detector = mp.tasks.vision.FaceLandmarker.create_from_options(options)
+        self.detector = create_face_landmarker(model_path, isVideo=self.isVideo, use_gpu=use_gpu)
         
         
         self.isHeadposeOn = isHeadposeOn
@@ -79,8 +66,8 @@ class FrameShow_head_face:
         self.arrow_length = 200
         
         
-        self.tracker_headpose = HeadPoseTracker01(model_path= model_path, isVideo= self.isVideo)
-        self.tracker_face = FaceTracker01(model_path= model_path, isVideo= self.isVideo)
+        self.tracker_headpose = HeadPoseTracker01(model_path= model_path, isVideo= self.isVideo, use_gpu= use_gpu)
+        self.tracker_face = FaceTracker01(model_path= model_path, isVideo= self.isVideo, use_gpu= use_gpu)
     
     
     def y_update(self, y_pos):
@@ -313,7 +300,8 @@ class FrameShow_head_face:
         # head
         pitch, yaw, roll  = self.tracker_headpose.get_calculate_angles(face_landmarks)
         # face
-        all_element = self.tracker_face.main_process(face_landmarks, frame.copy(), frame_height, frame_width)
+        # main_process only reads landmarks and the frame shape, so no copy is needed
+        all_element = self.tracker_face.main_process(face_landmarks, frame, frame_height, frame_width)
         
         return all_element, (pitch, yaw, roll), (frame_width, frame_height), face_landmarks, frame
     
@@ -362,7 +350,8 @@ class FrameShow_head_face:
             landmark_positions=getattr(all_element, "landmark_positions", None)
         )
         if self.isFaceOn:
-            frame = self._draw_visualization(face_landmarks, frame.copy(), metrics)
+            # Head pose and mask are already drawn in place on this buffer; keep drawing on it
+            frame = self._draw_visualization(face_landmarks, frame, metrics)
             
             # if self.isZoomFace:
             #     # frame = cv2.resize(enhanced_face, (frame_width, frame_height))
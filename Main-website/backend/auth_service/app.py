@@ -2,17 +2,17 @@
 from fastapi import FastAPI, Depends, HTTPException, status, WebSocket, WebSocketDisconnect, Body, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import APIKeyHeader
-from fastapi.responses import StreamingResponse, JSONResponse, FileResponse
+from fastapi.responses import StreamingResponse, JSONResponse, FileResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 import logging
 from typing import Optional, Dict, Any, List
 import asyncio
 import json
+import hmac
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 import os
 from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient
 from pathlib import Path
 import threading
 import sys
@@ -65,6 +65,13 @@ logger.info("Environment variables loaded:")
 logger.info(f"ADMIN_USERNAME is set: {bool(os.getenv('ADMIN_USERNAME'))}")
 logger.info(f"ADMIN_PASSWORD is set: {bool(os.getenv('ADMIN_PASSWORD'))}")
 
+# Serialize JSON responses (settings, admin data, dataset listings) with orjson when it is installed
+try:
+    import orjson  # noqa: F401
+    DefaultResponse = ORJSONResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
 # Create FastAPI app
 app = FastAPI(
     title="Eye Tracking API",
@@ -72,6 +79,7 @@ app = FastAPI(
     description="API for eye tracking and user preferences management",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=DefaultResponse
 )
 
 # Configure CORS
@@ -141,6 +149,15 @@ app.include_router(
 # Store active WebSocket connections
 active_connections = set()
 
+# The per-frame acknowledgement never changes, so it is serialized once and sent as text
+_WS_FRAME_ACK = json.dumps({
+    "status": "processed",
+    "message": "Frame received and processed"
+}, separators=(",", ":"))
+
+# A client that cannot take an ack within this long is dropped instead of pinning its handler
+WS_SEND_TIMEOUT_S = 1.0
+
 @app.websocket("/ws/video")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
@@ -151,14 +168,13 @@ async def websocket_endpoint(websocket: WebSocket):
         while True:
             try:
                 data = await websocket.receive_bytes()
-                response = {
-                    "status": "processed",
-                    "message": "Frame received and processed"
-                }
-                await websocket.send_json(response)
+                await asyncio.wait_for(websocket.send_text(_WS_FRAME_ACK), timeout=WS_SEND_TIMEOUT_S)
             except WebSocketDisconnect:
                 logger.info("Client disconnected")
                 break
+            except asyncio.TimeoutError:
+                logger.warning("Dropping WebSocket client: send timed out")
+                break
             except Exception as e:
                 logger.error(f"Error processing WebSocket message: {str(e)}")
                 await websocket.send_json({
@@ -397,7 +413,10 @@ async def admin_auth(login: AdminLogin, request: Request):
                 detail="Server configuration error"
             )
         
-        if login.username == expected_username and login.password == expected_password:
+        # Constant-time comparison so response timing doesn't leak how much of the credentials matched
+        username_ok = hmac.compare_digest(login.username.encode(), expected_username.encode())
+        password_ok = hmac.compare_digest(login.password.encode(), expected_password.encode())
+        if username_ok and password_ok:
             logger.info("Login successful")
             
             # Generate session token
@@ -850,9 +869,8 @@ async def delete_user_consent(user_id: str):
         # Delete from user_preferences collection
         await db.user_preferences.delete_one({"user_id": user_id})
         
-        # Delete from consent collection if it exists
-        if 'consent' in await db.list_collection_names():
-            await db.consent.delete_one({"user_id": user_id})
+        # Delete from consent collection (no-op if the collection does not exist)
+        await db.consent.delete_one({"user_id": user_id})
         
         # Delete from data_center collection
         if await DataCenter.initialize():
@@ -5,11 +5,13 @@ import asyncio
 import logging
 import threading
 import time
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from bson import ObjectId, json_util
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -18,6 +20,17 @@ load_dotenv(dotenv_path=env_path)
 
 logger = logging.getLogger(__name__)
 
+# Longest a scheduled backup may run on the app loop before the backup thread gives up on it
+BACKUP_TIMEOUT_S = float(os.getenv("BACKUP_TIMEOUT_S", "600"))
+
+# Backups run on the app's event loop, so the JSON encode + file write goes to a small
+# bounded pool instead of stalling every request while a large collection is dumped
+_write_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="backup-write")
+
+def _write_json(path: Path, payload: Dict[str, Any]):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+
 class BackupManager:
     _instance = None
     _client = None
@@ -26,6 +39,7 @@ class BackupManager:
     _auto_backup_enabled = True
     _backup_thread = None
     _running = False
+    _loop = None  # event loop the MongoDB client is bound to
     
     def __new__(cls):
         """Singleton pattern"""
@@ -36,6 +50,9 @@ class BackupManager:
     def __init__(self):
         if not hasattr(self, '_initialized'):
             self._initialized = True
+            # Set by stop() so the backup thread wakes immediately instead of finishing its wait;
+            # also guards starting/stopping the thread
+            self._cv = threading.Condition()
             self._setup_backup_directory()
             self._start_backup_thread()
     
@@ -59,28 +76,65 @@ class BackupManager:
     
     def _start_backup_thread(self):
         """Start background backup thread"""
-        if not self._running:
+        # Check-and-start under the same lock stop() uses, so a racing start/stop can't leave two loops
+        with self._cv:
+            if self._running:
+                return
             self._running = True
             self._backup_thread = threading.Thread(target=self._backup_loop, daemon=True)
             self._backup_thread.start()
-            logger.info("Backup thread started")
+        logger.info("Backup thread started")
     
     def _backup_loop(self):
         """Background thread for periodic backups"""
-        while self._running:
+        me = threading.current_thread()
+        # A loop that was stopped and then replaced by a restart exits even if _running is True again
+        stopped = lambda: not self._running or self._backup_thread is not me
+        failures = 0
+        while not stopped():
             try:
                 # Perform backup every 5 minutes
-                time.sleep(300)
-                asyncio.run(self.perform_backup())
+                with self._cv:
+                    if self._cv.wait_for(stopped, timeout=300):
+                        break
+                if self._loop is not None and self._loop.is_running():
+                    # Run on the client's own loop instead of spinning up a new one
+                    future = asyncio.run_coroutine_threadsafe(self.perform_backup(), self._loop)
+                    self._wait_for_backup(future, stopped)
+                else:
+                    asyncio.run(self.perform_backup())
+                failures = 0
             except Exception as e:
-                logger.error(f"Error in backup loop: {e}")
-                time.sleep(60)  # Wait 1 minute before retrying
+                # A persistent fault would otherwise log every minute; back off to 1st, 2nd, 4th, 8th... failure
+                failures += 1
+                if failures & (failures - 1) == 0:
+                    logger.error("Error in backup loop (failure #%d): %s", failures, e)
+                with self._cv:
+                    self._cv.wait_for(stopped, timeout=60)  # Wait 1 minute before retrying
     
-    async def initialize(self, client: AsyncIOMotorClient, db_name: str):
+    def _wait_for_backup(self, future, stopped):
+        """Wait for a backup scheduled on the app loop, giving up on timeout or stop()"""
+        # Poll in short slices so a stalled or shut-down loop can't pin this thread forever
+        deadline = time.monotonic() + BACKUP_TIMEOUT_S
+        while True:
+            try:
+                future.result(timeout=1)
+                return
+            except concurrent.futures.TimeoutError:
+                if stopped():
+                    future.cancel()
+                    logger.warning("Backup manager stopping; cancelled in-flight backup")
+                    return
+                if time.monotonic() >= deadline:
+                    future.cancel()
+                    raise TimeoutError(f"Backup did not finish within {BACKUP_TIMEOUT_S:.0f}s")
+    
+    async def initialize(self, client: AsyncMongoClient, db_name: str):
         """Initialize backup manager with MongoDB connection"""
         try:
             self._client = client
             self._db = self._client[db_name]
+            self._loop = asyncio.get_running_loop()
             logger.info("Backup manager initialized successfully")
             return True
         except Exception as e:
@@ -100,19 +154,22 @@ class BackupManager:
             # Backup all collections
             collections = await self._db.list_collection_names()
             
+            counts = {}
             for collection_name in collections:
-                await self._backup_collection(collection_name, timestamp)
+                count = await self._backup_collection(collection_name, timestamp)
+                if count is not None:
+                    counts[collection_name] = count
             
             # Create backup summary
-            await self._create_backup_summary(timestamp)
+            await self._create_backup_summary(timestamp, counts)
             
             logger.info(f"Backup completed successfully at {timestamp}")
             
         except Exception as e:
             logger.error(f"Backup failed: {e}")
     
-    async def _backup_collection(self, collection_name: str, timestamp: str):
-        """Backup a specific collection"""
+    async def _backup_collection(self, collection_name: str, timestamp: str) -> Optional[int]:
+        """Backup a specific collection, returning how many documents were written"""
         try:
             collection = self._db[collection_name]
             documents = []
@@ -140,21 +197,22 @@ class BackupManager:
             backup_file = self._backup_dir / backup_subdir / f"{collection_name}_{timestamp}.json"
             
             # Save to JSON file
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'collection_name': collection_name,
-                    'backup_timestamp': timestamp,
-                    'document_count': len(documents),
-                    'documents': documents
-                }, f, indent=2, ensure_ascii=False)
+            await asyncio.get_running_loop().run_in_executor(_write_executor, _write_json, backup_file, {
+                'collection_name': collection_name,
+                'backup_timestamp': timestamp,
+                'document_count': len(documents),
+                'documents': documents
+            })
             
             logger.info(f"Backed up {collection_name}: {len(documents)} documents")
+            return len(documents)
             
         except Exception as e:
             logger.error(f"Failed to backup collection {collection_name}: {e}")
+            return None
     
-    async def _create_backup_summary(self, timestamp: str):
-        """Create a backup summary file"""
+    async def _create_backup_summary(self, timestamp: str, counts: Dict[str, int]):
+        """Create a backup summary file from the per-collection counts of this backup"""
         try:
             summary = {
                 'backup_timestamp': timestamp,
@@ -164,11 +222,8 @@ class BackupManager:
                 'backup_directory': str(self._backup_dir)
             }
             
-            # Count documents in each collection
-            collections = await self._db.list_collection_names()
-            for collection_name in collections:
-                collection = self._db[collection_name]
-                doc_count = await collection.count_documents({})
+            # Reuse the counts from the dump itself rather than re-listing and counting every collection
+            for collection_name, doc_count in counts.items():
                 summary['collections_backed_up'].append({
                     'name': collection_name,
                     'document_count': doc_count
@@ -177,8 +232,7 @@ class BackupManager:
             
             # Save summary
             summary_file = self._backup_dir / f"backup_summary_{timestamp}.json"
-            with open(summary_file, 'w', encoding='utf-8') as f:
-                json.dump(summary, f, indent=2, ensure_ascii=False)
+            await asyncio.get_running_loop().run_in_executor(_write_executor, _write_json, summary_file, summary)
             
             logger.info(f"Backup summary created: {summary['total_documents']} total documents")
             
@@ -285,10 +339,24 @@ class BackupManager:
     
     def stop(self):
         """Stop the backup manager"""
-        self._running = False
-        if self._backup_thread:
-            self._backup_thread.join(timeout=5)
+        with self._cv:
+            self._running = False
+            thread, self._backup_thread = self._backup_thread, None
+            self._cv.notify_all()
+        # Join outside the lock; the loop needs it to observe the stop
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
         logger.info("Backup manager stopped")
 
-# Global backup manager instance
-backup_manager = BackupManager() 
\ No newline at end of file
+# Global backup manager instance, created on first use: constructing it makes the backup
+# directories and starts the backup thread, which importing this module shouldn't do
+_backup_manager = None
+_backup_manager_lock = threading.Lock()
+
+def get_backup_manager() -> BackupManager:
+    global _backup_manager
+    if _backup_manager is None:
+        with _backup_manager_lock:
+            if _backup_manager is None:
+                _backup_manager = BackupManager()
+    return _backup_manager 
\ No newline at end of file
@@ -103,6 +103,19 @@ class DataCenterService:
             if not await MongoDB.ensure_connected():
                 logger.error("Failed to connect to MongoDB for DataCenter initialization")
                 return False
+
+            if self.initialized:
+                # Handlers call initialize() per request; only the connection check repeats
+                return True
+
+            # Every lookup here is find_one({"key": ...}) on per-user keys such as
+            # settings_<id>; without an index on key each one scans the whole collection
+            try:
+                from db.services.data_centralization_service import DataCentralizationService
+                await DataCentralizationService.initialize_collection()
+            except Exception as e:
+                logger.warning(f"Could not create data_centralization indexes: {e}")
+
             self.initialized = True
             logger.info("DataCenter service initialized successfully")
             return True
@@ -172,7 +185,7 @@ class DataCenterService:
                 upsert=True
             )
             
-            logger.info(f"Updated key '{key}' in data_centralization collection")
+            logger.debug("Updated key '%s' in data_centralization collection", key)
             return result.acknowledged
         except Exception as e:
             logger.error(f"Error updating value for key {key}: {e}")
@@ -193,7 +206,7 @@ class DataCenterService:
                 return False
             
             result = await db.data_centralization.delete_one({"key": key})
-            logger.info(f"Deleted key '{key}' from data_centralization collection")
+            logger.debug("Deleted key '%s' from data_centralization collection", key)
             return result.acknowledged
         except Exception as e:
             logger.error(f"Error deleting value for key {key}: {e}")
@@ -218,7 +231,7 @@ class DataCenterService:
             async for doc in cursor:
                 values[doc["key"]] = doc.get("value")
             
-            logger.info(f"Retrieved {len(values)} values from data_centralization collection")
+            logger.debug("Retrieved %d values from data_centralization collection", len(values))
             return values
         except Exception as e:
             logger.error(f"Error getting all values: {e}")
@@ -1,9 +1,13 @@
 # backend/db/mongodb.py
 import os
 import logging
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient
 from typing import Optional
 import asyncio
+import time
+import random
+import threading
+import weakref
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -16,13 +20,35 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Import backup manager
-from .backup_manager import backup_manager
+from .backup_manager import get_backup_manager
 
 class MongoDB:
     _client = None
     _db = None
     _connection_attempts = 0
-    _max_attempts = 3
+    _max_attempts = 8
+    _retry_after = 0.0  # monotonic time before which connect() will not retry
+    _max_retry_delay = 30.0
+    _last_ping_ts = 0.0
+    _ping_ttl = 10.0  # seconds between liveness pings in ensure_connected
+    _client_loop_ref = None  # weakref to the event loop the primary client is bound to
+    # loop -> AsyncMongoClient for any other event loops; keyed by the loop object itself so a
+    # collected loop drops its entry and a new loop can never inherit a dead loop's client
+    _loop_clients = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def _client_options(cls):
+        client_options = {
+            "serverSelectionTimeoutMS": 2000,
+            "maxPoolSize": int(os.getenv("MONGO_MAX_POOL", "50")),
+            "minPoolSize": int(os.getenv("MONGO_MIN_POOL", "10")),
+            "maxIdleTimeMS": 30000,
+            "waitQueueTimeoutMS": 2000,
+            # Negotiated with the server in order; codecs whose module is missing are skipped
+            "compressors": os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib"),
+            "zlibCompressionLevel": 3,
+        }
+        return client_options
 
     @classmethod
     async def connect(cls):
@@ -31,49 +57,109 @@ class MongoDB:
                 logger.error("Max connection attempts reached")
                 return False
 
+            # Full-jitter backoff so restarting workers don't reconnect in lockstep
+            if time.monotonic() < cls._retry_after:
+                logger.warning("MongoDB reconnect backoff in effect, skipping connection attempt")
+                return False
+
             cls._connection_attempts += 1
             logger.info(f"Attempting to connect to MongoDB (attempt {cls._connection_attempts})")
             
-            cls._client = AsyncIOMotorClient(os.getenv("MONGODB_URL"))
+            cls._client = AsyncMongoClient(os.getenv("MONGODB_URL"), **cls._client_options())
             cls._db = cls._client[os.getenv("MONGODB_DB_NAME")]
+            cls._client_loop_ref = weakref.ref(asyncio.get_running_loop())
             
             # Verify connection
             await cls._client.admin.command('ping')
+            cls._last_ping_ts = time.monotonic()
             logger.info("Successfully connected to MongoDB")
             
+            # Warm the pool so the first concurrent requests don't pay the handshake cost
+            await cls._warm_pool()
+            
             # Initialize backup manager
-            await backup_manager.initialize(cls._client, os.getenv("MONGODB_DB_NAME"))
+            await get_backup_manager().initialize(cls._client, os.getenv("MONGODB_DB_NAME"))
             
             # Reset connection attempts on success
             cls._connection_attempts = 0
+            cls._retry_after = 0.0
             return True
             
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {str(e)}")
+            retry_delay = random.uniform(0, min(cls._max_retry_delay, 2 ** cls._connection_attempts))
+            cls._retry_after = time.monotonic() + retry_delay
+            logger.info(f"Next MongoDB connection attempt in {retry_delay:.2f}s")
             if cls._client:
-                cls._client.close()
+                await cls._client.close()
                 cls._client = None
                 cls._db = None
             return False
 
+    @classmethod
+    async def _warm_pool(cls):
+        min_pool_size = cls._client_options()["minPoolSize"]
+        try:
+            await asyncio.gather(*[cls._client.admin.command('ping') for _ in range(min_pool_size)])
+            logger.info(f"Warmed MongoDB connection pool with {min_pool_size} connections")
+        except Exception as e:
+            logger.warning(f"MongoDB pool warm-up failed: {str(e)}")
+
     @classmethod
     async def close(cls):
         if cls._client:
             try:
-                cls._client.close()
+                await cls._client.close()
                 logger.info("Closed MongoDB connection")
             except Exception as e:
                 logger.error(f"Error closing MongoDB connection: {str(e)}")
             finally:
                 cls._client = None
                 cls._db = None
+                cls._last_ping_ts = 0.0
+                cls._client_loop_ref = None
+        current = asyncio.get_running_loop()
+        for loop, client in list(cls._loop_clients.items()):
+            try:
+                if loop is current:
+                    await client.close()
+                elif loop.is_running():
+                    # Clients must be closed on the loop they are bound to
+                    await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.close(), loop))
+                else:
+                    cls._close_orphaned(client)
+            except Exception as e:
+                logger.error(f"Error closing MongoDB connection: {str(e)}")
+        cls._loop_clients.clear()
+
+    @staticmethod
+    def _close_orphaned(client):
+        """Best-effort close of a client whose event loop has already closed"""
+        def run():
+            try:
+                asyncio.run(client.close())
+            except Exception as e:
+                logger.debug("Could not close MongoDB client of closed event loop: %s", e)
+        threading.Thread(target=run, daemon=True).start()
+
+    @classmethod
+    def _drop_closed_loop_clients(cls):
+        for loop in [loop for loop in list(cls._loop_clients.keys()) if loop.is_closed()]:
+            client = cls._loop_clients.pop(loop, None)
+            if client is not None:
+                logger.info("Closing MongoDB client of a closed event loop")
+                cls._close_orphaned(client)
 
     @classmethod
     async def ensure_connected(cls):
         if cls._client is None:
             return await cls.connect()
+        # Skip the round trip if the connection was verified recently
+        if time.monotonic() - cls._last_ping_ts < cls._ping_ttl:
+            return True
         try:
             await cls._client.admin.command('ping')
+            cls._last_ping_ts = time.monotonic()
             return True
         except Exception as e:
             logger.error(f"MongoDB connection check failed: {str(e)}")
@@ -83,7 +169,23 @@ class MongoDB:
     def get_db(cls):
         if cls._db is None:
             return None
-        return cls._db
+        # Async clients are bound to the loop they were created on, so give
+        # any other running loop (extra workers, test loops) its own client
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return cls._db
+        if cls._client_loop_ref is not None and cls._client_loop_ref() is loop:
+            return cls._db
+        client = cls._loop_clients.get(loop)
+        if client is None:
+            # New loops usually mean old ones went away; release their pools first
+            cls._drop_closed_loop_clients()
+            logger.info("Creating MongoDB client for additional event loop")
+            client = cls._loop_clients.setdefault(
+                loop, AsyncMongoClient(os.getenv("MONGODB_URL"), **cls._client_options())
+            )
+        return client[os.getenv("MONGODB_DB_NAME")]
 
 # Initialize db instance for import elsewhere
 db = MongoDB()
\ No newline at end of file
@@ -3,7 +3,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Dict, Any
 import logging
 from datetime import datetime
-from db.backup_manager import backup_manager
+from db.backup_manager import get_backup_manager
 from auth import verify_api_key
 
 logger = logging.getLogger(__name__)
@@ -17,7 +17,7 @@ router = APIRouter(
 async def perform_backup():
     """Manually trigger a backup"""
     try:
-        await backup_manager.perform_backup()
+        await get_backup_manager().perform_backup()
         return {
             "success": True,
             "message": "Backup completed successfully",
@@ -31,7 +31,7 @@ async def perform_backup():
 async def get_backup_files():
     """Get list of available backup files"""
     try:
-        files = backup_manager.get_backup_files()
+        files = get_backup_manager().get_backup_files()
         return {
             "success": True,
             "files": files,
@@ -45,7 +45,7 @@ async def get_backup_files():
 async def restore_from_backup(backup_file: str, collection_name: str = None):
     """Restore data from a backup file"""
     try:
-        success = await backup_manager.restore_from_backup(backup_file, collection_name)
+        success = await get_backup_manager().restore_from_backup(backup_file, collection_name)
         if success:
             return {
                 "success": True,
@@ -62,7 +62,7 @@ async def restore_from_backup(backup_file: str, collection_name: str = None):
 async def enable_auto_backup():
     """Enable automatic backup on operations"""
     try:
-        backup_manager.enable_auto_backup()
+        get_backup_manager().enable_auto_backup()
         return {
             "success": True,
             "message": "Auto-backup enabled",
@@ -76,7 +76,7 @@ async def enable_auto_backup():
 async def disable_auto_backup():
     """Disable automatic backup on operations"""
     try:
-        backup_manager.disable_auto_backup()
+        get_backup_manager().disable_auto_backup()
         return {
             "success": True,
             "message": "Auto-backup disabled",
@@ -90,7 +90,7 @@ async def disable_auto_backup():
 async def cleanup_old_backups(keep_days: int = 30):
     """Clean up old backup files"""
     try:
-        backup_manager.cleanup_old_backups(keep_days)
+        get_backup_manager().cleanup_old_backups(keep_days)
         return {
             "success": True,
             "message": f"Cleaned up backups older than {keep_days} days",
@@ -104,6 +104,7 @@ async def cleanup_old_backups(keep_days: int = 30):
 async def get_backup_status():
     """Get backup manager status"""
     try:
+        backup_manager = get_backup_manager()
         return {
             "success": True,
             "auto_backup_enabled": backup_manager._auto_backup_enabled,
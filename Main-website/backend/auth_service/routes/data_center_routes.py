@@ -116,9 +116,7 @@ async def update_zoom(user_id: str, zoom_data: Dict[str, float]):
 async def get_values():
     """Get all values from the data center"""
     try:
-        # Initialize the service if needed
-        await data_center_service.initialize()
-        
+        # get_all_values initializes the service on first use, so no explicit initialize() here
         # Get all values (already serialized by DataCenter class)
         values = await data_center_service.get_all_values()
         return values
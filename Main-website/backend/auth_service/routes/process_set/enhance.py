@@ -26,6 +26,15 @@ class EnhanceResponse(BaseModel):
     message: str
     data: Optional[Dict[str, Any]] = None
 
+def _list_output_files(directory: str) -> List[str]:
+    """
+    Image/CSV outputs in a folder, or [] if it doesn't exist (one listdir, no separate exists check)
+    """
+    try:
+        return [f for f in os.listdir(directory) if f.endswith(('.jpg', '.png', '.csv'))]
+    except FileNotFoundError:
+        return []
+
 @router.post("/process", dependencies=[Depends(verify_api_key)])
 async def process_with_enhance(request: EnhanceRequest):
     """
@@ -84,14 +93,8 @@ async def get_enhance_status(user_id: str):
         enhance_dir = f"/app/resource_security/public/enhance/{user_id}"
         complete_dir = f"/app/resource_security/public/complete/{user_id}"
         
-        enhance_files = []
-        complete_files = []
-        
-        if os.path.exists(enhance_dir):
-            enhance_files = [f for f in os.listdir(enhance_dir) if f.endswith(('.jpg', '.png', '.csv'))]
-        
-        if os.path.exists(complete_dir):
-            complete_files = [f for f in os.listdir(complete_dir) if f.endswith(('.jpg', '.png', '.csv'))]
+        enhance_files = _list_output_files(enhance_dir)
+        complete_files = _list_output_files(complete_dir)
         
         return {
             "status": "success",
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional
+from fastapi.responses import JSONResponse, ORJSONResponse
+from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
 import os
 import base64
+import asyncio
 from auth import verify_api_key
 import logging
 from dotenv import load_dotenv
@@ -22,6 +24,87 @@ router = APIRouter(
     }
 )
 
+# Resolved once at import; every request builds its user folder from here
+PUBLIC_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../resource_security/public'))
+
+# File listings are plain dicts already, so they are handed straight to the response class
+# (orjson when installed) instead of going through jsonable_encoder entry by entry
+try:
+    import orjson  # noqa: F401
+    ListResponse = ORJSONResponse
+except ImportError:
+    ListResponse = JSONResponse
+
+# CSVs up to this size are inlined in /list-files when include_content is set
+INLINE_CONTENT_MAX_BYTES = 4096
+
+# Extensions returned by /list-files
+LIST_FILE_EXTENSIONS = frozenset(('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.csv', '.txt', '.json', '.log'))
+
+def extract_number(filename: str) -> int:
+    """
+    Set number between the last '_' and the following '.' (webcam_012.jpg -> 12), or 0 if there is none
+    """
+    i = filename.rfind('_')
+    if i < 0:
+        return 0
+    j = filename.find('.', i + 1)
+    digits = filename[i + 1:j] if j >= 0 else filename[i + 1:]
+    return int(digits) if digits.isdigit() else 0
+
+# Define folder mapping
+FOLDER_MAPPING = {
+    'captures': 'captures',
+    'enhance': 'enhance',
+    'complete': 'complete'
+}
+
+def _resolve_user_folder(user_id: str, folder: str):
+    """
+    Map a folder name to (actual folder name, directory) for a user; shared by list-files and preview-api
+    """
+    # Get the actual folder name
+    actual_folder = FOLDER_MAPPING.get(folder, folder)
+    
+    # Handle different folder structures - all folders are user-specific
+    if folder in ('enhance', 'complete'):
+        # For enhance and complete, they are in /public/{folder}/{userId}/
+        return actual_folder, os.path.join(PUBLIC_DIR, actual_folder, user_id)
+    # For captures, use /public/captures/{userId}
+    return actual_folder, os.path.join(PUBLIC_DIR, 'captures', user_id)
+
+def _scan_dir_sync(file_dir: str, folder: str, user_id: str, include_content: bool = False) -> List[Dict[str, Any]]:
+    """
+    List a user's folder with metadata, sorted by set number (blocking; run via asyncio.to_thread).
+    With include_content, small CSVs carry their text so clients skip a preview call per set.
+    """
+    # scandir gives the file type from the directory listing itself, so each file
+    # costs one stat instead of three
+    files = []
+    with os.scandir(file_dir) as entries:
+        for entry in entries:
+            file = entry.name
+            ext = os.path.splitext(file)[1].lower()
+            if ext in LIST_FILE_EXTENSIONS and entry.is_file():
+                # Get file metadata
+                stat = entry.stat()
+                
+                file_info = {
+                    'filename': file,
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime,
+                    'path': f"/{folder}/{user_id}/{file}",
+                    'file_type': ext[1:] if ext else 'unknown'
+                }
+                if include_content and ext == '.csv' and stat.st_size <= INLINE_CONTENT_MAX_BYTES:
+                    with open(entry.path, 'r', errors='replace') as f:
+                        file_info['content'] = f.read()
+                files.append(file_info)
+    
+    # Sort files by number in filename if present
+    files.sort(key=lambda x: extract_number(x['filename']))
+    return files
+
 class PreviewResponse(BaseModel):
     success: bool
     data: Optional[str] = None
@@ -32,37 +115,19 @@ class PreviewResponse(BaseModel):
     mtime: Optional[float] = None
 
 @router.get("/list-files", dependencies=[Depends(verify_api_key)])
-async def list_files(userId: str = "default", folder: str = "captures"):
-    """List files in a specific folder"""
+async def list_files(userId: str = "default", folder: str = "captures", include_content: bool = False):
+    """List files in a specific folder (include_content inlines small CSVs)"""
     try:
         logging.info(f"list_files called with userId: {userId}, folder: {folder}")
-        # Get the base directory
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        base_dir = os.path.abspath(os.path.join(current_dir, '../../resource_security/public'))
-        
-        # Define folder mapping
-        folder_mapping = {
-            'captures': 'captures',
-            'enhance': 'enhance',
-            'complete': 'complete'
-        }
-        
-        # Get the actual folder name
-        actual_folder = folder_mapping.get(folder, folder)
-        
         # Use the provided userId directly - don't fallback to first available folder
         actual_user_id = userId
+        actual_folder, file_dir = _resolve_user_folder(actual_user_id, folder)
         
-        # Handle different folder structures - all folders are user-specific
-        if folder in ['enhance', 'complete']:
-            # For enhance and complete, they are in /public/{folder}/{userId}/
-            file_dir = os.path.join(base_dir, actual_folder, actual_user_id)
-        else:
-            # For captures, use /public/captures/{userId}
-            file_dir = os.path.join(base_dir, 'captures', actual_user_id)
-        
-        
-        if not os.path.exists(file_dir):
+        # Scan on a worker thread so a large folder doesn't stall the event loop; a missing
+        # folder shows up as FileNotFoundError from scandir instead of a separate exists() check
+        try:
+            files = await asyncio.to_thread(_scan_dir_sync, file_dir, actual_folder, actual_user_id, include_content)
+        except FileNotFoundError:
             os.makedirs(file_dir, exist_ok=True)
             return {
                 "success": True,
@@ -72,34 +137,11 @@ async def list_files(userId: str = "default", folder: str = "captures"):
                 "no_dataset": True
             }
         
-        # Read files from directory with metadata
-        files = []
-        for file in os.listdir(file_dir):
-            file_path = os.path.join(file_dir, file)
-            if os.path.isfile(file_path):
-                ext = os.path.splitext(file)[1].lower()
-                if ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.csv', '.txt', '.json', '.log']:
-                    # Get file metadata
-                    file_size = os.path.getsize(file_path)
-                    file_mtime = os.path.getmtime(file_path)
-                    
-                    files.append({
-                        'filename': file,
-                        'size': file_size,
-                        'mtime': file_mtime,
-                        'path': f"/{actual_folder}/{actual_user_id}/{file}",
-                        'file_type': ext[1:] if ext else 'unknown'
-                    })
-        
-        # Sort files by number in filename if present
-        files.sort(key=lambda x: int(x['filename'].split('_')[-1].split('.')[0]) if '_' in x['filename'] and x['filename'].split('_')[-1].split('.')[0].isdigit() else 0)
-        
-        
-        return {
+        return ListResponse(content={
             "success": True,
             "files": files,
             "message": f"Found {len(files)} files in {actual_folder} folder"
-        }
+        })
         
     except Exception as e:
         logging.error(f"Error listing files: {str(e)}")
@@ -115,30 +157,9 @@ async def get_preview(filename: str, userId: str = "default", folder: str = "cap
     """Get preview of a file from specified folder"""
     try:
         logging.info(f"get_preview called with userId: {userId}, filename: {filename}, folder: {folder}")
-        # Get the base directory
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        base_dir = os.path.abspath(os.path.join(current_dir, '../../resource_security/public'))
-        
-        # Define folder mapping
-        folder_mapping = {
-            'captures': 'captures',
-            'enhance': 'enhance',
-            'complete': 'complete'
-        }
-        
-        # Get the actual folder name
-        actual_folder = folder_mapping.get(folder, folder)
-        
         # Use the provided userId directly - don't fallback to first available folder
         actual_user_id = userId
-        
-        # Handle different folder structures - all folders are user-specific
-        if folder in ['enhance', 'complete']:
-            # For enhance and complete, they are in /public/{folder}/{userId}/
-            file_dir = os.path.join(base_dir, actual_folder, actual_user_id)
-        else:
-            # For captures, use /public/captures/{userId}
-            file_dir = os.path.join(base_dir, 'captures', actual_user_id)
+        actual_folder, file_dir = _resolve_user_folder(actual_user_id, folder)
         
         # Create folders if they don't exist
         if not os.path.exists(file_dir):
@@ -162,7 +183,7 @@ async def get_preview(filename: str, userId: str = "default", folder: str = "cap
         if file_ext in ['.jpg', '.jpeg', '.png', '.gif']:
             # Read and encode the image file
             with open(file_path, 'rb') as f:
-                image_data = base64.b64encode(f.read()).decode('utf-8')
+                image_data = base64.b64encode(f.read()).decode('ascii')
                 
             # Get file size and modification time for debugging
             file_size = os.path.getsize(file_path)
@@ -3,10 +3,14 @@ from fastapi import APIRouter, Depends, File, Form, UploadFile, HTTPException, B
 from typing import Optional, Dict, Any, List
 from pydantic import BaseModel
 import os
+import shutil
 import subprocess
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from auth import verify_api_key
 
+logger = logging.getLogger(__name__)
+
 # Import the processing modules
 # Note: These imports will be handled by the respective services
 # The routes will call the services via HTTP endpoints
@@ -35,6 +39,16 @@ class ProcessingResponse(BaseModel):
     message: str
     error: str = None
 
+# Script and capture/enhance directories, resolved once at import
+_CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROCESS_SCRIPT_PATH = os.path.abspath(os.path.join(_CURRENT_DIR, '../../image_service/process_images.py'))
+CAPTURE_DIR = os.path.abspath(os.path.join(_CURRENT_DIR, '../../frontend/public/captures/eye_tracking_captures'))
+ENHANCE_DIR = os.path.abspath(os.path.join(_CURRENT_DIR, '../../frontend/public/captures/enhance'))
+
+# The two per-set copies run side by side; process_images itself is sync (it runs
+# subprocesses), so it stays in the BackgroundTasks threadpool rather than going async
+_copy_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="set-copy")
+
 # Global variable to track processing status
 processing_status = {
     "isProcessing": False,
@@ -128,40 +142,40 @@ def process_images(set_numbers: List[int]):
             "processedSets": []
         }
         
-        # Get the script directory
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        script_path = os.path.abspath(os.path.join(current_dir, '../../image_service/process_images.py'))
-        
-        # Get the directories - fixed paths to use correct directory structure
-        capture_dir = os.path.abspath(os.path.join(current_dir, '../../frontend/public/captures/eye_tracking_captures'))
-        enhance_dir = os.path.abspath(os.path.join(current_dir, '../../frontend/public/captures/enhance'))
+        script_path = PROCESS_SCRIPT_PATH
+        capture_dir = CAPTURE_DIR
+        enhance_dir = ENHANCE_DIR
         
         # Ensure enhance directory exists
         if not os.path.exists(enhance_dir):
-            logging.info(f"Creating enhance directory: {enhance_dir}")
+            logger.info(f"Creating enhance directory: {enhance_dir}")
             os.makedirs(enhance_dir, exist_ok=True)
         
         # Debug logging for paths
-        logging.info(f"Capture directory: {capture_dir}")
-        logging.info(f"Enhance directory: {enhance_dir}")
+        logger.info(f"Capture directory: {capture_dir}")
+        logger.info(f"Enhance directory: {enhance_dir}")
         
-        # Get the last processed number from enhance directory
+        # Get the last processed number from enhance directory (set number sliced
+        # straight out of webcam_enhance_NNN.jpg)
         last_processed = 0
         if os.path.exists(enhance_dir):
+            prefix, suffix = 'webcam_enhance_', '.jpg'
             for file in os.listdir(enhance_dir):
-                if file.startswith('webcam_enhance_') and file.endswith('.jpg'):
-                    try:
-                        num = int(file.split('_')[2].split('.')[0])
-                        last_processed = max(last_processed, num)
-                    except (ValueError, IndexError):
-                        continue
+                if file.startswith(prefix) and file.endswith(suffix):
+                    digits = file[len(prefix):-len(suffix)]
+                    if digits.isdigit():
+                        last_processed = max(last_processed, int(digits))
         
-        logging.info(f"Last processed number: {last_processed}")
+        logger.info(f"Last processed number: {last_processed}")
+        
+        # List the capture directory once so each set's completeness check is a set lookup
+        # instead of six stat calls
+        capture_entries = set(os.listdir(capture_dir)) if os.path.isdir(capture_dir) else set()
         
         # Process each set number individually
         for i, set_num in enumerate(set_numbers):
             if set_num <= last_processed:
-                logging.info(f"Skipping set {set_num} as it's already processed")
+                logger.info(f"Skipping set {set_num} as it's already processed")
                 continue
                 
             # Update status for current set
@@ -174,19 +188,21 @@ def process_images(set_numbers: List[int]):
             screen_src = os.path.join(capture_dir, f'screen_{set_num:03d}.jpg')
             param_src = os.path.join(capture_dir, f'parameter_{set_num:03d}.csv')
             
+            webcam_exists = os.path.basename(webcam_src) in capture_entries
+            screen_exists = os.path.basename(screen_src) in capture_entries
+            param_exists = os.path.basename(param_src) in capture_entries
+            
             # Debug logging for source files
-            logging.info(f"Checking source files for set {set_num}:")
-            logging.info(f"Webcam source: {webcam_src} - Exists: {os.path.exists(webcam_src)}")
-            logging.info(f"Screen source: {screen_src} - Exists: {os.path.exists(screen_src)}")
-            logging.info(f"Parameter source: {param_src} - Exists: {os.path.exists(param_src)}")
+            logger.debug("Source files for set %s: webcam %s (%s), screen %s (%s), parameter %s (%s)",
+                         set_num, webcam_src, webcam_exists, screen_src, screen_exists, param_src, param_exists)
             
-            if not all(os.path.exists(f) for f in [webcam_src, screen_src, param_src]):
-                logging.error(f"Missing source files for set {set_num}")
+            if not (webcam_exists and screen_exists and param_exists):
+                logger.error(f"Missing source files for set {set_num}")
                 continue
             
             # Process webcam image
             cmd = ['python', script_path, str(set_num)]
-            logging.info(f"Executing command: {' '.join(cmd)}")
+            logger.debug("Executing command: %s", cmd)
             
             result = subprocess.run(
                 cmd,
@@ -195,37 +211,34 @@ def process_images(set_numbers: List[int]):
             )
             
             if result.returncode != 0:
-                logging.error(f"Processing error for set {set_num}: {result.stderr}")
+                logger.error(f"Processing error for set {set_num}: {result.stderr}")
                 processing_status["isProcessing"] = False
                 processing_status["currentTask"] = f"Error processing set {set_num}"
                 return False, result.stderr
             
-            # Copy screen image
+            # Copy the screen image and parameter file concurrently
             screen_dst = os.path.join(enhance_dir, f'screen_enhance_{set_num:03d}.jpg')
-            try:
-                logging.info(f"Copying screen image from {screen_src} to {screen_dst}")
-                with open(screen_src, 'rb') as src, open(screen_dst, 'wb') as dst:
-                    dst.write(src.read())
-                logging.info(f"Successfully copied screen image for set {set_num}")
-            except Exception as e:
-                logging.error(f"Error copying screen image for set {set_num}: {str(e)}")
-                continue
-            
-            # Copy parameter file
             param_dst = os.path.join(enhance_dir, f'parameter_enhance_{set_num:03d}.csv')
-            try:
-                logging.info(f"Copying parameter file from {param_src} to {param_dst}")
-                with open(param_src, 'r') as src, open(param_dst, 'w') as dst:
-                    dst.write(src.read())
-                logging.info(f"Successfully copied parameter file for set {set_num}")
-            except Exception as e:
-                logging.error(f"Error copying parameter file for set {set_num}: {str(e)}")
+            logger.debug("Copying screen image from %s to %s", screen_src, screen_dst)
+            logger.debug("Copying parameter file from %s to %s", param_src, param_dst)
+            copies = {
+                "screen image": _copy_executor.submit(shutil.copyfile, screen_src, screen_dst),
+                "parameter file": _copy_executor.submit(shutil.copyfile, param_src, param_dst),
+            }
+            copy_failed = False
+            for label, future in copies.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Error copying {label} for set {set_num}: {str(e)}")
+                    copy_failed = True
+            if copy_failed:
                 continue
             
             # Update processed sets
             processing_status["processedSets"].append(set_num)
             processing_status["progress"] = int(((i + 1) / len(set_numbers)) * 100)
-            logging.info(f"Successfully processed set {set_num}")
+            logger.info(f"Successfully processed set {set_num}")
         
         # Update final status
         processing_status["isProcessing"] = False
@@ -235,7 +248,7 @@ def process_images(set_numbers: List[int]):
         return True, "Processing completed successfully"
         
     except Exception as e:
-        logging.error(f"Error processing images: {str(e)}")
+        logger.error(f"Error processing images: {str(e)}")
         processing_status["isProcessing"] = False
         processing_status["currentTask"] = f"Error: {str(e)}"
         return False, str(e)
@@ -252,7 +265,7 @@ async def start_processing(request: ProcessingRequest, background_tasks: Backgro
             message="Processing started successfully"
         )
     except Exception as e:
-        logging.error(f"Error starting processing: {str(e)}")
+        logger.error(f"Error starting processing: {str(e)}")
         return ProcessingResponse(
             success=False,
             message="Failed to start processing",
@@ -3,12 +3,16 @@ import multiprocessing
 import sys
 import os
 import warnings
+import logging
 from dotenv import load_dotenv
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from typing import Optional
 from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
+
 # Suppress PyTorch image extension warning
 warnings.filterwarnings("ignore", message="Failed to load image Python extension")
 
@@ -23,13 +27,21 @@ load_dotenv('.env.backend')
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from routes.process_images import process_images
-from routes.individualProcess import process_single_image
+from routes.individualProcess import process_single_image, ensure_face_tracker
+
+# Serialize responses (base64 images + metrics) with orjson when it is installed
+try:
+    import orjson  # noqa: F401
+    DefaultResponse = ORJSONResponse
+except ImportError:
+    DefaultResponse = JSONResponse
 
 # Create FastAPI app for image service
 app = FastAPI(
     title="Image Processing Service",
     version="1.0.0",
-    description="API for image processing and analysis"
+    description="API for image processing and analysis",
+    default_response_class=DefaultResponse
 )
 
 # Configure CORS
@@ -41,6 +53,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def startup_event():
+    """Warm the face tracker model"""
+    try:
+        await ensure_face_tracker()
+        print("✅ Face tracker initialized")
+    except Exception as e:
+        # Requests will retry initialization on first use
+        print(f"❌ Error initializing face tracker at startup: {str(e)}")
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -80,7 +102,7 @@ async def process_images_batch(request: ProcessImagesRequest):
             userId=request.userId,
             enhanceFace=request.enhanceFace
         ):
-            print(f"📊 Processing result: {result}")
+            logger.debug("Processing result: %s", result)
             results.append(result)
         
         print(f"✅ Processing completed. Total results: {len(results)}")
@@ -123,7 +145,8 @@ async def process_single_image_endpoint(
             enhanceFace=enhance_face_bool
         )
         
-        return result
+        # Hand the dict straight to the response class so it skips FastAPI's jsonable_encoder walk
+        return DefaultResponse(content=result)
         
     except Exception as e:
         print(f"Error in process_single_image_endpoint: {str(e)}")
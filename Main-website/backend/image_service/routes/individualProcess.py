@@ -2,6 +2,12 @@
 import cv2
 import numpy as np
 import base64
+import asyncio
+import threading
+import copy
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import UploadFile
 import tempfile
 import os
@@ -14,12 +20,67 @@ import json
 from PIL import Image
 import io
 import subprocess
+import atexit
+
+# Thin libjpeg-turbo wrapper for JPEG decode/encode in native BGR (falls back to OpenCV)
+try:
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+# Keep OpenCV's SIMD paths on and cap its internal pool; requests already fan out over _executor
+cv2.setUseOptimized(True)
+cv2.setNumThreads(min(4, os.cpu_count() or 1))
+
+# SIMD base64 encoder for the response payload (falls back to the stdlib)
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+JPEG_QUALITY = 85
+# OpenCV fallback encode args, built once (quality 85, Huffman optimization left off)
+_JPEG_PARAMS = [int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY]
+
+# Uploads are copied out of Starlette's spooled file in fixed-size chunks
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Uploads larger than this are rejected while streaming instead of being buffered whole
+MAX_UPLOAD_BYTES = int(os.environ.get("IMAGE_MAX_UPLOAD_MB", "25")) * 1024 * 1024
+
+# AVIF fallback temp files go to RAM-backed tmpfs when available
+TMPFS_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+_avif_scratch = threading.local()
+_avif_paths = set()  # every scratch path handed out, removed at interpreter exit
+_avif_paths_lock = threading.Lock()
+
+# Long-edge limit for images fed to the face tracker; larger uploads are downscaled first
+# unless face enhancement was requested (its output keeps the upload's resolution)
+MAX_EDGE = 1280
+
+# LRU of recent results keyed by (content hash, display flags); retries and calibration resend identical frames
+RESULT_CACHE_SIZE = int(os.environ.get("IMAGE_RESULT_CACHE_SIZE", "128"))
+# Entries carry the base64 output image (often several MB), so the cache is also bounded by size
+RESULT_CACHE_BYTES = int(os.environ.get("IMAGE_RESULT_CACHE_BYTES", str(64 * 1024 * 1024)))
+_result_cache = OrderedDict()  # key -> (result, approximate size in bytes)
+_result_cache_bytes = 0
+_result_cache_lock = threading.Lock()
+
+# Per-worker-thread decode buffer for oversized JPEGs (only ever read by the resize in the same call)
+_scratch = threading.local()
+
+# Bounded pool for CPU-bound decode / inference / encode work, kept off the event loop
+_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="image-worker")
 
 # Import the face tracking class
-from Main_AI.Main_model.showframeVisualization import FrameShow_head_face
+from Main_AI.Main_model.showframeVisualization import (
+    FrameShow_head_face, resolve_model_path, classify_head_pose,
+    POINT_PAIR_FIELDS, EYE_CENTER_KEYS, LANDMARK_KEYS
+)
 
 # Initialize face tracker for image processing
 image_face_tracker = None  # Will be initialized on first use
+_tracker_lock = None  # asyncio.Lock guarding lazy tracker construction
+_init_lock = threading.Lock()  # guards construction across executor threads
 
 def get_face_tracker():
     """
@@ -27,41 +88,286 @@ def get_face_tracker():
     """
     global image_face_tracker
     if image_face_tracker is None:
-        try:
-            image_face_tracker = FrameShow_head_face(
-                isVideo=False,  # Set to False for image processing
-                isHeadposeOn=True,
-                isFaceOn=True
-            )
-        except Exception as e:
-            pass
-            raise
+        with _init_lock:
+            if image_face_tracker is None:
+                image_face_tracker = FrameShow_head_face(
+                    model_path=resolve_model_path(),
+                    isVideo=False,  # Set to False for image processing
+                    isHeadposeOn=True,
+                    isFaceOn=True
+                )
         
     return image_face_tracker
 
+async def ensure_face_tracker():
+    """
+    Lazily construct the face tracker once, off the event loop.
+    Called at startup to warm the model and again per request as a safety net.
+    """
+    global _tracker_lock
+    if image_face_tracker is not None:
+        return image_face_tracker
+    if _tracker_lock is None:
+        _tracker_lock = asyncio.Lock()
+    async with _tracker_lock:
+        if image_face_tracker is None:
+            await asyncio.get_running_loop().run_in_executor(_executor, get_face_tracker)
+    return image_face_tracker
+
+# Last display flags applied to the shared tracker (show_head_pose, show_bounding_box, show_mask, show_parameters)
+_last_flags = (None, None, None, None)
+# One tracker instance is shared and its display flags are per-instance state, so setting the
+# flags and running process_frame happen together under this lock
+_tracker_call_lock = threading.Lock()
+
+def _apply_tracker_flags(face_tracker, flags):
+    """
+    Call the tracker display setters only when the requested flags differ from the last ones applied
+    (caller holds _tracker_call_lock)
+    """
+    global _last_flags
+    if flags == _last_flags:
+        return
+    show_head_pose, show_bounding_box, show_mask, show_parameters = flags
+    face_tracker.set_IsShowHeadpose(show_head_pose)
+    face_tracker.set_IsShowBox(show_bounding_box)
+    face_tracker.set_IsMaskOn(show_mask)
+    face_tracker.set_labet_face_element(show_parameters)
+    _last_flags = flags
+
+def _run_tracker(face_tracker, image, flags, enhanceFace):
+    """
+    Run the face tracker on one frame with the given display flags (runs in executor thread)
+    """
+    with _tracker_call_lock:
+        _apply_tracker_flags(face_tracker, flags)
+        timestamp_ms = int(1000)
+        return face_tracker.process_frame(
+            image,
+            timestamp_ms,
+            isVideo=False,
+            isEnhanceFace=enhanceFace
+        )
+
+async def run_face_tracker(image, show_head_pose, show_bounding_box, show_mask, show_parameters, enhanceFace):
+    """
+    Run the face tracker off the event loop and return its (metrics, processed_image) result
+    """
+    face_tracker = await ensure_face_tracker()
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor,
+        _run_tracker,
+        face_tracker,
+        image,
+        (show_head_pose, show_bounding_box, show_mask, show_parameters),
+        enhanceFace
+    )
+
+def _to_list(x):
+    """
+    Convert an ndarray or tuple coordinate to a plain list without an intermediate array allocation
+    """
+    return x.tolist() if isinstance(x, np.ndarray) else list(x)
+
+async def read_upload(file: UploadFile):
+    """
+    Read an upload into a single buffer preallocated from its size, chunk by chunk.
+    Returns None as soon as the upload exceeds MAX_UPLOAD_BYTES.
+    """
+    if file.size and file.size > MAX_UPLOAD_BYTES:
+        return None
+    buf = bytearray(file.size or 0)
+    offset = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        n = len(chunk)
+        if offset + n > MAX_UPLOAD_BYTES:
+            return None
+        buf[offset:offset + n] = chunk
+        offset += n
+    if offset < len(buf):
+        del buf[offset:]
+    return buf
+
+def _cache_get(key):
+    """
+    Return a copy of a cached result (refreshing its LRU position), or None
+    """
+    with _result_cache_lock:
+        entry = _result_cache.get(key)
+        if entry is None:
+            return None
+        _result_cache.move_to_end(key)
+    return copy.deepcopy(entry[0])
+
+def _cache_put(key, result):
+    """
+    Store a successful result, evicting least recently used entries while over the entry or byte limit
+    """
+    global _result_cache_bytes
+    if RESULT_CACHE_SIZE <= 0 or RESULT_CACHE_BYTES <= 0:
+        return
+    # The encoded image dominates; metrics add a few KB at most
+    nbytes = len(result.get("image", {}).get("data") or "") + 4096
+    if nbytes > RESULT_CACHE_BYTES:
+        return
+    result = copy.deepcopy(result)
+    with _result_cache_lock:
+        previous = _result_cache.pop(key, None)
+        if previous is not None:
+            _result_cache_bytes -= previous[1]
+        _result_cache[key] = (result, nbytes)
+        _result_cache_bytes += nbytes
+        while len(_result_cache) > RESULT_CACHE_SIZE or _result_cache_bytes > RESULT_CACHE_BYTES:
+            _, (_, evicted_bytes) = _result_cache.popitem(last=False)
+            _result_cache_bytes -= evicted_bytes
+
+def _downscale_image(image: np.ndarray, scale: float) -> np.ndarray:
+    """
+    Shrink an oversized upload before face tracking (cost scales with pixel count)
+    """
+    return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+def _scratch_buffer(nbytes: int) -> bytearray:
+    """
+    Return this thread's scratch buffer, growing it only when a larger frame arrives
+    """
+    buf = getattr(_scratch, "buf", None)
+    if buf is None or len(buf) < nbytes:
+        buf = bytearray(nbytes)
+        _scratch.buf = buf
+    return buf
+
+def decode_and_fit(content, file_extension, downscale: bool = True):
+    """
+    Decode an upload and, if downscale is set, shrink it to MAX_EDGE in one executor hop.
+    Returns (image, original_width, original_height, scale).
+    """
+    if downscale and simplejpeg is not None and content.startswith(b'\xff\xd8\xff'):
+        try:
+            height, width, _, _ = simplejpeg.decode_jpeg_header(content)
+            scale = min(1.0, MAX_EDGE / max(width, height))
+            if scale < 1.0:
+                # Full-size pixels are only needed until the resize below, so decode into reused memory
+                full = simplejpeg.decode_jpeg(
+                    content,
+                    colorspace='BGR',
+                    fastdct=True,
+                    fastupsample=True,
+                    buffer=_scratch_buffer(height * width * 3)
+                )
+                return _downscale_image(full, scale), width, height, scale
+        except Exception:
+            pass
+    
+    image = decode_image(content, file_extension)
+    if image is None or image.size == 0:
+        return image, 0, 0, 1.0
+    original_height, original_width = image.shape[:2]
+    scale = min(1.0, MAX_EDGE / max(original_width, original_height)) if downscale else 1.0
+    if scale < 1.0:
+        image = _downscale_image(image, scale)
+    return image, original_width, original_height, scale
+
+def encode_jpeg(image: np.ndarray):
+    """
+    Encode a BGR image to JPEG (bytes, or OpenCV's uint8 buffer), using simplejpeg when available
+    """
+    if simplejpeg is not None and image.ndim == 3 and image.shape[2] == 3 and image.dtype == np.uint8:
+        return simplejpeg.encode_jpeg(
+            np.ascontiguousarray(image),
+            quality=JPEG_QUALITY,
+            colorspace='BGR',
+            fastdct=True
+        )
+    _, buffer = cv2.imencode('.jpg', image, _JPEG_PARAMS)
+    return buffer
+
+def encode_image_base64(image: np.ndarray) -> str:
+    """
+    Encode a BGR image to a base64 JPEG string for the JSON response
+    """
+    jpeg = encode_jpeg(image)
+    if pybase64 is not None:
+        return pybase64.b64encode_as_string(jpeg)
+    return base64.b64encode(jpeg).decode('ascii')
+
+def decode_image(content, file_extension):
+    """
+    Decode uploaded image bytes into a BGR ndarray, trying simplejpeg, OpenCV, then format converters
+    """
+    image = None
+    try:
+        if simplejpeg is not None and content.startswith(b'\xff\xd8\xff'):
+            try:
+                image = simplejpeg.decode_jpeg(
+                    content,
+                    colorspace='BGR',
+                    fastdct=True,
+                    fastupsample=True
+                )
+            except Exception:
+                image = None
+        nparr = np.frombuffer(content, np.uint8)
+        if image is None:
+            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        if image is None:
+            # Try with different flags
+            image = cv2.imdecode(nparr, cv2.IMREAD_UNCHANGED)
+    except Exception as decode_error:
+        pass
+    
+    # If still no image and it's an unsupported format, try conversion
+    if image is None and file_extension == '.avif':
+        # Decode in memory when Pillow has AVIF support, otherwise go through avifdec temp files
+        image = convert_image_with_pil(content, file_extension)
+        if image is None:
+            image = convert_avif_with_system_tool(content, file_extension)
+    elif image is None and file_extension == '.webp':
+        pass
+        image = convert_image_with_pil(content, file_extension)
+    
+    return image
+
+def _avif_scratch_paths():
+    """
+    Fixed per-thread temp paths for the avifdec fallback, reused (truncated) instead of
+    creating and unlinking new inodes on every request
+    """
+    paths = getattr(_avif_scratch, "paths", None)
+    if paths is None:
+        base = os.path.join(TMPFS_DIR or tempfile.gettempdir(),
+                            f"eyetrack_{os.getpid()}_{threading.get_ident()}")
+        paths = {ext: base + ext for ext in ('.avif', '.png', '.jpg', '.bmp')}
+        _avif_scratch.paths = paths
+        with _avif_paths_lock:
+            _avif_paths.update(paths.values())
+    return paths
+
+@atexit.register
+def _remove_avif_scratch():
+    with _avif_paths_lock:
+        for path in _avif_paths:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
 def convert_avif_with_system_tool(content, file_extension):
     """
     Convert AVIF images using the system's avifdec tool
     """
     try:
-        # First, let's check what avifdec supports
-        try:
-            help_result = subprocess.run(['avifdec', '--help'], capture_output=True, text=True, timeout=10)
-        except Exception as e:
-            pass
-        
-        # Create temporary files for input and output
-        with tempfile.NamedTemporaryFile(suffix='.avif', delete=False) as input_file:
+        paths = _avif_scratch_paths()
+        input_path = paths['.avif']
+        with open(input_path, 'wb') as input_file:
             input_file.write(content)
-            input_path = input_file.name
         
         # Try different output formats
-        output_formats = ['.png', '.jpg', '.yuv', '.bmp']
         image = None
-        
-        for output_ext in output_formats:
-            with tempfile.NamedTemporaryFile(suffix=output_ext, delete=False) as output_file:
-                output_path = output_file.name
+        for output_ext in ('.png', '.jpg', '.bmp'):
+            output_path = paths[output_ext]
+            # Truncate so a failed run can never pick up a previous request's output
+            open(output_path, 'wb').close()
             
             try:
                 # Use avifdec to convert AVIF
@@ -71,37 +377,13 @@ def convert_avif_with_system_tool(content, file_extension):
                     output_path
                 ], capture_output=True, text=True, timeout=30)
                 
-                if result.returncode == 0:
-                    # Check if output file exists and has content
-                    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
-                        # Try to read with OpenCV
-                        if output_ext == '.yuv':
-                            # For YUV format, we need to know dimensions - skip for now
-                            continue
-                        else:
-                            image = cv2.imread(output_path)
-                            if image is not None:
-                                break
+                if result.returncode == 0 and os.path.getsize(output_path) > 0:
+                    image = cv2.imread(output_path)
+                    if image is not None:
+                        break
                 
             except Exception as e:
                 pass
-            finally:
-                # Clean up output file
-                try:
-                    if os.path.exists(output_path):
-                        os.unlink(output_path)
-                except:
-                    pass
-        
-        # Clean up input file
-        try:
-            if os.path.exists(input_path):
-                os.unlink(input_path)
-        except:
-            pass
-        
-        if image is None:
-            return None
         
         return image
         
@@ -158,389 +440,212 @@ async def process_single_image(
         Dictionary containing processing results and metrics
     """
     try:
-        # Get the face tracker
-        face_tracker = get_face_tracker()
+        # Read the file content first
+        content = await read_upload(file)
+        if content is None:
+            return {"success": False, "error": f"Uploaded file is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB"}
+        if not content or len(content) == 0:
+            return {"success": False, "error": "Uploaded file is empty"}
         
-        # Configure the face tracker based on parameters
-        face_tracker.set_IsShowHeadpose(show_head_pose)
-        face_tracker.set_IsShowBox(show_bounding_box)
-        face_tracker.set_IsMaskOn(show_mask)
-        face_tracker.set_labet_face_element(show_parameters)
+        # Identical upload with identical flags: skip decode, inference and encode
+        cache_key = (
+            hashlib.sha256(content).digest(),
+            (show_head_pose, show_bounding_box, show_mask, show_parameters, enhanceFace)
+        )
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return cached
         
-        tmp_path = None
-        try:
-            # Read the file content first
-            content = await file.read()
-            if not content or len(content) == 0:
-                return {"success": False, "error": "Uploaded file is empty"}
+        # Detect image format from content
+        def detect_image_format(content):
+            """Detect image format from file content"""
+            # Define signature bytes outside f-string to avoid backslash issues
+            jpeg_sig = b'\xff\xd8\xff'
+            png_sig = b'\x89PNG\r\n\x1a\n'
+            gif_sig1 = b'GIF87a'
+            gif_sig2 = b'GIF89a'
+            bmp_sig = b'BM'
+            avif_sig = b'ftypavif'
+            webp_sig = b'RIFF'
             
             pass
             
-            # Detect image format from content
-            def detect_image_format(content):
-                """Detect image format from file content"""
-                # Define signature bytes outside f-string to avoid backslash issues
-                jpeg_sig = b'\xff\xd8\xff'
-                png_sig = b'\x89PNG\r\n\x1a\n'
-                gif_sig1 = b'GIF87a'
-                gif_sig2 = b'GIF89a'
-                bmp_sig = b'BM'
-                avif_sig = b'ftypavif'
-                webp_sig = b'RIFF'
-                
-                pass
-                
-                if content.startswith(jpeg_sig):
-                    return '.jpg'
-                elif content.startswith(png_sig):
-                    return '.png'
-                elif content.startswith(gif_sig1) or content.startswith(gif_sig2):
-                    return '.gif'
-                elif content.startswith(bmp_sig):
-                    return '.bmp'
-                elif avif_sig in content[:20]:  # AVIF signature is usually in the first 20 bytes
-                    return '.avif'
-                elif content.startswith(webp_sig):
-                    return '.webp'
-                else:
-                    # Default to jpg if format is unknown
-                    return '.jpg'
-            
-            # Get the appropriate file extension
-            file_extension = detect_image_format(content)
-            
-            # Create a temporary file with the correct extension
-            with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as tmp_file:
-                tmp_file.write(content)
-                tmp_path = tmp_file.name
-            
-            # Process the single image
-            pass
+            if content.startswith(jpeg_sig):
+                return '.jpg'
+            elif content.startswith(png_sig):
+                return '.png'
+            elif content.startswith(gif_sig1) or content.startswith(gif_sig2):
+                return '.gif'
+            elif content.startswith(bmp_sig):
+                return '.bmp'
+            elif avif_sig in content[:20]:  # AVIF signature is usually in the first 20 bytes
+                return '.avif'
+            elif content.startswith(webp_sig):
+                return '.webp'
+            else:
+                # Default to jpg if format is unknown
+                return '.jpg'
+        
+        # Get the appropriate file extension
+        file_extension = detect_image_format(content)
+        
+        # Decode directly from the uploaded bytes (no temporary file round-trip) and downscale
+        # oversized uploads before the landmark pass, in a single hop off the event loop
+        loop = asyncio.get_running_loop()
+        try:
+            image, original_width, original_height, scale = await loop.run_in_executor(
+                _executor, decode_and_fit, content, file_extension, not enhanceFace
+            )
             
-            # Try reading with different methods
-            image = None
-            try:
-                # First try with default flags
-                image = cv2.imread(tmp_path)
-                pass
+            if image is None:
+                error_message = f"Could not read image file with any method. File size: {len(content)} bytes, Detected format: {file_extension}."
                 
-                if image is None:
-                    # Try with different flags
-                    image = cv2.imread(tmp_path, cv2.IMREAD_COLOR)
-                    pass
-                    
-                if image is None:
-                    image = cv2.imread(tmp_path, cv2.IMREAD_UNCHANGED)
-                    pass
+                if file_extension == '.avif':
+                    error_message += " AVIF format conversion failed. Please ensure libavif-dev is installed in the system or convert your image to JPG, PNG, or another supported format."
+                else:
+                    error_message += " Supported formats: JPG, JPEG, PNG, GIF, BMP, WebP, AVIF"
                 
-                if image is None:
-                    # Try reading from memory buffer instead
-                    pass
-                    try:
-                        nparr = np.frombuffer(content, np.uint8)
-                        pass
-                        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                        pass
-                        if image is not None:
-                            pass
-                        else:
-                            # Try with different flags
-                            image = cv2.imdecode(nparr, cv2.IMREAD_UNCHANGED)
-                            pass
-                            if image is not None:
-                                pass
-                    except Exception as decode_error:
-                        pass
+                return {"success": False, "error": error_message}
                 
-                # If still no image and it's an unsupported format, try conversion
-                if image is None and file_extension == '.avif':
-                    pass
-                    image = convert_avif_with_system_tool(content, file_extension)
-                elif image is None and file_extension == '.webp':
-                    pass
-                    image = convert_image_with_pil(content, file_extension)
-                
-                if image is None:
-                    # Try to create a simple test image to verify OpenCV is working
-                    pass
-                    try:
-                        test_img = np.zeros((100, 100, 3), dtype=np.uint8)
-                        test_img[:, :] = [255, 0, 0]  # Blue image
-                        test_success = cv2.imwrite('/tmp/test_opencv.jpg', test_img)
-                        pass
-                        
-                        # Try to read the test image
-                        test_read = cv2.imread('/tmp/test_opencv.jpg')
-                        pass
-                        
-                        # Clean up test file
-                        if os.path.exists('/tmp/test_opencv.jpg'):
-                            os.unlink('/tmp/test_opencv.jpg')
-                            
-                    except Exception as test_error:
-                        pass
-                    
-                    error_message = f"Could not read image file with any method. File size: {os.path.getsize(tmp_path)} bytes, Detected format: {file_extension}."
-                    
-                    if file_extension == '.avif':
-                        error_message += " AVIF format conversion failed. Please ensure libavif-dev is installed in the system or convert your image to JPG, PNG, or another supported format."
-                    else:
-                        error_message += " Supported formats: JPG, JPEG, PNG, GIF, BMP, WebP, AVIF"
-                    
-                    return {"success": False, "error": error_message}
-                    
-            except Exception as e:
-                pass
-                return {"success": False, "error": f"Error reading image file: {str(e)}"}
-            
-            # Check if image is valid
-            if image is None or image.size == 0:
-                return {"success": False, "error": "Image file appears to be corrupted or empty"}
-            
+        except Exception as e:
             pass
+            return {"success": False, "error": f"Error reading image file: {str(e)}"}
+        
+        # Check if image is valid
+        if image is None or image.size == 0:
+            return {"success": False, "error": "Image file appears to be corrupted or empty"}
+        
+        pass
+        
+        # Process the image with the shared face tracker
+        metrics, processed_image = await run_face_tracker(
+            image,
+            show_head_pose,
+            show_bounding_box,
+            show_mask,
+            show_parameters,
+            enhanceFace
+        )
+        
+        processed_height, processed_width = processed_image.shape[:2]
+        
+        # Convert processed image to base64
+        img_str = await loop.run_in_executor(_executor, encode_image_base64, processed_image)
+        
+        # Prepare result
+        result = {
+            "success": True,
+            "image": {
+                "width": processed_width,
+                "height": processed_height,
+                "data": img_str
+            },
+            "face_detected": metrics is not None,
+            "metrics": {}
+        }
+        
+        # If face enhancement is enabled or the upload was downscaled, store original dimensions.
+        # Metrics are always in the returned image's pixel space (width/height above); multiply
+        # by 1/scale to map them onto the original upload
+        if enhanceFace or scale < 1.0:
+            result["image"]["original_width"] = original_width
+            result["image"]["original_height"] = original_height
+            result["image"]["scale"] = round(scale, 6)
+        
+        # Extract metrics if face was detected
+        if metrics is not None:
+            # Snapshot the dataclass fields once; every lookup below is then a plain dict get
+            m = vars(metrics)
+            head_pose_angles = m.get('head_pose_angles')
             
-            # Store original dimensions before processing
-            original_width = image.shape[1]
-            original_height = image.shape[0]
-            
-            # Process the image
-            timestamp_ms = int(1000)
-            metrics, processed_image = face_tracker.process_frame(
-                image,
-                timestamp_ms,
-                isVideo=False,
-                isEnhanceFace=enhanceFace
-            )
-            
-            # Convert processed image to base64
-            _, buffer = cv2.imencode('.jpg', processed_image)
-            img_str = base64.b64encode(buffer).decode('utf-8')
+            # Add all available metrics
+            if head_pose_angles is not None:
+                pitch, yaw, roll = np.round(np.asarray(head_pose_angles, dtype=np.float64), 3).tolist()
+                result["metrics"]["head_pose"] = {
+                    "pitch": pitch,
+                    "yaw": yaw,
+                    "roll": roll
+                }
             
-            # Prepare result
-            result = {
-                "success": True,
-                "image": {
-                    "width": processed_image.shape[1],
-                    "height": processed_image.shape[0],
-                    "data": img_str
-                },
-                "face_detected": metrics is not None,
-                "metrics": {}
-            }
+            # 2-6. Add face/eye/iris boxes and iris centers
+            for attr, keys, csv_keys in POINT_PAIR_FIELDS:
+                value = m.get(attr)
+                if value is None:
+                    continue
+                try:
+                    first, second = (_to_list(p) for p in value)
+                    result["metrics"][attr] = {keys[0]: first, keys[1]: second}
+                    # Add individual components for CSV format
+                    for key, coord in zip(csv_keys, (first[0], first[1], second[0], second[1])):
+                        result["metrics"][key] = int(coord)
+                except (TypeError, ValueError, IndexError):
+                    pass
             
-            # If face enhancement is enabled, store original dimensions
-            if enhanceFace:
-                result["image"]["original_width"] = original_width
-                result["image"]["original_height"] = original_height
+            # 7. Add eye_centers
+            eye_centers = m.get('eye_centers')
+            if eye_centers is not None:
+                try:
+                    for (x_key, y_key), center in zip(EYE_CENTER_KEYS, eye_centers):
+                        result["metrics"][x_key] = int(center[0])
+                        result["metrics"][y_key] = int(center[1])
+                except Exception as e:
+                    pass
             
-            # Extract metrics if face was detected
-            if metrics is not None:
-                # Add all available metrics
-                if hasattr(metrics, 'head_pose_angles') and metrics.head_pose_angles is not None:
-                    pitch, yaw, roll = metrics.head_pose_angles
-                    result["metrics"]["head_pose"] = {
-                        "pitch": round(pitch, 3),
-                        "yaw": round(yaw, 3),
-                        "roll": round(roll, 3)
-                    }
-                
-                # 2. Add face_box (face bounding box)
-                if hasattr(metrics, 'face_box') and metrics.face_box is not None:
-                    try:
-                        min_pos, max_pos = metrics.face_box
-                        result["metrics"]["face_box"] = {
-                            "min": np.array(min_pos).tolist() if hasattr(min_pos, 'tolist') else list(min_pos),
-                            "max": np.array(max_pos).tolist() if hasattr(max_pos, 'tolist') else list(max_pos)
-                        }
-                        # Add individual components for CSV format
-                        min_x, min_y = min_pos
-                        max_x, max_y = max_pos
-                        result["metrics"]["face_min_position_x"] = int(min_x)
-                        result["metrics"]["face_min_position_y"] = int(min_y)
-                        result["metrics"]["face_max_position_x"] = int(max_x)
-                        result["metrics"]["face_max_position_y"] = int(max_y)
-                    except Exception as e:
-                        pass
-                
-                # 3. Add left_eye_box
-                if hasattr(metrics, 'left_eye_box') and metrics.left_eye_box is not None:
-                    try:
-                        min_left, max_left = metrics.left_eye_box
-                        result["metrics"]["left_eye_box"] = {
-                            "min": np.array(min_left).tolist() if hasattr(min_left, 'tolist') else list(min_left),
-                            "max": np.array(max_left).tolist() if hasattr(max_left, 'tolist') else list(max_left)
-                        }
-                        # Add individual components for CSV format
-                        min_x, min_y = min_left
-                        max_x, max_y = max_left
-                        result["metrics"]["left_eye_box_min_x"] = int(min_x)
-                        result["metrics"]["left_eye_box_min_y"] = int(min_y)
-                        result["metrics"]["left_eye_box_max_x"] = int(max_x)
-                        result["metrics"]["left_eye_box_max_y"] = int(max_y)
-                    except Exception as e:
-                        pass
-                
-                # 4. Add right_eye_box
-                if hasattr(metrics, 'right_eye_box') and metrics.right_eye_box is not None:
-                    try:
-                        min_right, max_right = metrics.right_eye_box
-                        result["metrics"]["right_eye_box"] = {
-                            "min": np.array(min_right).tolist() if hasattr(min_right, 'tolist') else list(min_right),
-                            "max": np.array(max_right).tolist() if hasattr(max_right, 'tolist') else list(max_right)
-                        }
-                        # Add individual components for CSV format
-                        min_x, min_y = min_right
-                        max_x, max_y = max_right
-                        result["metrics"]["right_eye_box_min_x"] = int(min_x)
-                        result["metrics"]["right_eye_box_min_y"] = int(min_y)
-                        result["metrics"]["right_eye_box_max_x"] = int(max_x)
-                        result["metrics"]["right_eye_box_max_y"] = int(max_y)
-                    except Exception as e:
-                        pass
-                
-                # 5. Add eye_iris_center
-                if hasattr(metrics, 'eye_iris_center') and metrics.eye_iris_center is not None:
-                    try:
-                        left_iris, right_iris = metrics.eye_iris_center
-                        result["metrics"]["eye_iris_center"] = {
-                            "left": np.array(left_iris).tolist() if hasattr(left_iris, 'tolist') else list(left_iris),
-                            "right": np.array(right_iris).tolist() if hasattr(right_iris, 'tolist') else list(right_iris)
-                        }
-                    except Exception as e:
-                        pass
-                
-                # 6. Add eye_iris boxes
-                if hasattr(metrics, 'eye_iris_left_box') and metrics.eye_iris_left_box is not None:
-                    try:
-                        min_left, max_left = metrics.eye_iris_left_box
-                        result["metrics"]["eye_iris_left_box"] = {
-                            "min": np.array(min_left).tolist() if hasattr(min_left, 'tolist') else list(min_left),
-                            "max": np.array(max_left).tolist() if hasattr(max_left, 'tolist') else list(max_left)
-                        }
-                    except Exception as e:
-                        pass
-                
-                if hasattr(metrics, 'eye_iris_right_box') and metrics.eye_iris_right_box is not None:
-                    try:
-                        min_right, max_right = metrics.eye_iris_right_box
-                        result["metrics"]["eye_iris_right_box"] = {
-                            "min": np.array(min_right).tolist() if hasattr(min_right, 'tolist') else list(min_right),
-                            "max": np.array(max_right).tolist() if hasattr(max_right, 'tolist') else list(max_right)
-                        }
-                    except Exception as e:
-                        pass
-                
-                # 7. Add eye_centers
-                if hasattr(metrics, 'eye_centers') and metrics.eye_centers is not None:
-                    try:
-                        eye_centers = metrics.eye_centers
-                        if len(eye_centers) > 0:
-                            left_eye = eye_centers[0]
-                            result["metrics"]["left_eye_position_x"] = int(left_eye[0])
-                            result["metrics"]["left_eye_position_y"] = int(left_eye[1])
-                        
-                        if len(eye_centers) > 1:
-                            right_eye = eye_centers[1]
-                            result["metrics"]["right_eye_position_x"] = int(right_eye[0])
-                            result["metrics"]["right_eye_position_y"] = int(right_eye[1])
-                        
-                        if len(eye_centers) > 2:
-                            mid_eye = eye_centers[2]
-                            result["metrics"]["center_between_eyes_x"] = int(mid_eye[0])
-                            result["metrics"]["center_between_eyes_y"] = int(mid_eye[1])
-                    except Exception as e:
-                        pass
-                
-                # 8. Add landmark positions
-                if hasattr(metrics, 'landmark_positions') and metrics.landmark_positions is not None:
-                    try:
-                        landmarks = metrics.landmark_positions
-                        result["metrics"]["landmarks"] = {}
-                        
-                        # Map specific landmark positions to our named parameters
-                        landmark_mapping = {
-                            'nose': ['nose_position_x', 'nose_position_y'],
-                            'chin': ['chin_position_x', 'chin_position_y'],
-                            'face_center': ['face_center_position_x', 'face_center_position_y'],
-                            'left_cheek': ['cheek_left_position_x', 'cheek_left_position_y'],
-                            'right_cheek': ['cheek_right_position_x', 'cheek_right_position_y'],
-                            'left_mouth': ['mouth_left_position_x', 'mouth_left_position_y'],
-                            'right_mouth': ['mouth_right_position_x', 'mouth_right_position_y'],
-                            'left_eye_socket': ['eye_socket_left_center_x', 'eye_socket_left_center_y'],
-                            'right_eye_socket': ['eye_socket_right_center_x', 'eye_socket_right_center_y']
-                        }
-                        
-                        # Add all landmarks to result
-                        for landmark_name, landmark_position in landmarks.items():
-                            pos_array = np.array(landmark_position).tolist() if hasattr(landmark_position, 'tolist') else list(landmark_position)
-                            result["metrics"]["landmarks"][landmark_name] = pos_array
-                            
-                            # Also add the specific named parameters if this landmark is in our mapping
-                            if landmark_name in landmark_mapping:
-                                x_key, y_key = landmark_mapping[landmark_name]
-                                result["metrics"][x_key] = int(landmark_position[0])
-                                result["metrics"][y_key] = int(landmark_position[1])
-                    except Exception as e:
-                        pass
-                
-                # 9. Add eye states
-                if hasattr(metrics, 'left_eye_state') and metrics.left_eye_state is not None:
-                    try:
-                        state, ear = metrics.left_eye_state
-                        result["metrics"]["left_eye_state"] = state
-                        result["metrics"]["left_eye_ear"] = round(ear, 3)
-                    except Exception as e:
-                        pass
-                
-                if hasattr(metrics, 'right_eye_state') and metrics.right_eye_state is not None:
-                    try:
-                        state, ear = metrics.right_eye_state
-                        result["metrics"]["right_eye_state"] = state
-                        result["metrics"]["right_eye_ear"] = round(ear, 3)
-                    except Exception as e:
-                        pass
-                
-                # 10. Add depth information
-                if hasattr(metrics, 'depths') and metrics.depths is not None:
-                    try:
-                        face_depth, left_eye_depth, right_eye_depth, chin_depth = metrics.depths
-                        result["metrics"]["distance_cm_from_face"] = round(face_depth, 3)
-                        result["metrics"]["distance_cm_from_eye"] = round(float((left_eye_depth + right_eye_depth) / 2), 3)
-                        result["metrics"]["chin_depth"] = round(chin_depth, 3)
-                    except Exception as e:
-                        pass
-                
-                # 11. Add derived parameters like posture and gaze direction
-                if hasattr(metrics, 'head_pose_angles') and metrics.head_pose_angles is not None:
-                    pitch, yaw, roll = metrics.head_pose_angles
-                    
-                    # Determine posture based on pitch
-                    posture = "Looking Straight"
-                    if pitch > 10:
-                        posture = "Looking Down"
-                    elif pitch < -10:
-                        posture = "Looking Up"
-                        
-                    result["metrics"]["posture"] = posture
+            # 8. Add landmark positions
+            landmarks = m.get('landmark_positions')
+            if landmarks is not None:
+                try:
+                    result["metrics"]["landmarks"] = {}
                     
-                    # Determine gaze direction based on yaw
-                    gaze_direction = "Looking Straight"
-                    if yaw > 10:
-                        gaze_direction = "Looking Right"
-                    elif yaw < -10:
-                        gaze_direction = "Looking Left"
+                    # Add all landmarks to result
+                    for landmark_name, landmark_position in landmarks.items():
+                        pos_array = _to_list(landmark_position)
+                        result["metrics"]["landmarks"][landmark_name] = pos_array
                         
-                    result["metrics"]["gaze_direction"] = gaze_direction
+                        # Also add the specific named parameters if this landmark is in our mapping
+                        if landmark_name in LANDMARK_KEYS:
+                            x_key, y_key = LANDMARK_KEYS[landmark_name]
+                            result["metrics"][x_key] = int(landmark_position[0])
+                            result["metrics"][y_key] = int(landmark_position[1])
+                except Exception as e:
+                    pass
+            
+            # 9. Add eye states
+            if m.get('left_eye_state') is not None:
+                try:
+                    state, ear = m['left_eye_state']
+                    result["metrics"]["left_eye_state"] = state
+                    result["metrics"]["left_eye_ear"] = round(ear, 3)
+                except Exception as e:
+                    pass
             
-            return result
+            if m.get('right_eye_state') is not None:
+                try:
+                    state, ear = m['right_eye_state']
+                    result["metrics"]["right_eye_state"] = state
+                    result["metrics"]["right_eye_ear"] = round(ear, 3)
+                except Exception as e:
+                    pass
             
-        finally:
-            # Clean up temporary file
-            if tmp_path and os.path.exists(tmp_path):
+            # 10. Add depth information
+            if m.get('depths') is not None:
                 try:
-                    os.unlink(tmp_path)
-                except:
+                    face_depth, left_eye_depth, right_eye_depth, chin_depth = m['depths']
+                    result["metrics"]["distance_cm_from_face"] = round(face_depth, 3)
+                    result["metrics"]["distance_cm_from_eye"] = round(float((left_eye_depth + right_eye_depth) / 2), 3)
+                    result["metrics"]["chin_depth"] = round(chin_depth, 3)
+                except Exception as e:
                     pass
+            
+            # 11. Add derived parameters like posture and gaze direction
+            if head_pose_angles is not None:
+                pitch, yaw, roll = head_pose_angles
+                posture, gaze_direction = classify_head_pose(pitch, yaw)
+                result["metrics"]["posture"] = posture
+                result["metrics"]["gaze_direction"] = gaze_direction
+        
+        _cache_put(cache_key, result)
+        return result
     
     except Exception as e:
         error_msg = f"Error processing single image: {str(e)}"
@@ -6,6 +6,7 @@ import warnings
 from dotenv import load_dotenv
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from typing import Optional
 
 # Suppress PyTorch image extension warning
@@ -23,11 +24,19 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from process_video import process_video_handler
 
+# Serialize responses (base64 images + metrics) with orjson when it is installed
+try:
+    import orjson  # noqa: F401
+    DefaultResponse = ORJSONResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
 # Create FastAPI app for video service
 app = FastAPI(
     title="Video Processing Service",
     version="1.0.0",
-    description="API for video processing and analysis"
+    description="API for video processing and analysis",
+    default_response_class=DefaultResponse
 )
 
 # Configure CORS
@@ -61,7 +70,8 @@ async def process_video(
             showMask=showMask,
             showParameters=showParameters
         )
-        return result
+        # Hand the dict straight to the response class so it skips FastAPI's jsonable_encoder walk
+        return DefaultResponse(content=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 